@@ -1,6 +1,7 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
-app = FastAPI(title="ClearSplit API")
+app = FastAPI(title="ClearSplit API", default_response_class=ORJSONResponse)
 
 
 @app.get("/health")
@@ -26,6 +26,7 @@ class ExpenseSplit(Base):
     )
     expense_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        ForeignKey("expenses.id", ondelete="CASCADE"),
         nullable=False,
     )
     group_id: Mapped[uuid.UUID] = mapped_column(
@@ -34,6 +35,7 @@ class ExpenseSplit(Base):
     )
     membership_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        ForeignKey("memberships.id", ondelete="RESTRICT"),
         nullable=False,
     )
     share_cents: Mapped[int] = mapped_column(BigInteger(), nullable=False)
@@ -44,7 +44,7 @@ class Membership(Base):
         nullable=False,
     )
     role: Mapped[MembershipRole] = mapped_column(
-        SQLEnum(MembershipRole, name="membership_role"),
+        SQLEnum(MembershipRole, name="membership_role", values_callable=lambda e: [m.value for m in e]),
         nullable=False,
     )
     created_at: Mapped[datetime] = mapped_column(
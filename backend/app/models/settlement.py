@@ -39,7 +39,7 @@ class SettlementBatch(Base):
         nullable=False,
     )
     status: Mapped[SettlementStatus] = mapped_column(
-        SQLEnum(SettlementStatus, name="settlement_status"),
+        SQLEnum(SettlementStatus, name="settlement_status", values_callable=lambda e: [m.value for m in e]),
         server_default="'suggested'",
         nullable=False,
     )
@@ -81,6 +81,7 @@ class Settlement(Base):
     )
     batch_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        ForeignKey("settlement_batches.id", ondelete="CASCADE"),
         nullable=False,
     )
     group_id: Mapped[uuid.UUID] = mapped_column(
@@ -89,15 +90,17 @@ class Settlement(Base):
     )
     from_membership: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        ForeignKey("memberships.id", ondelete="RESTRICT"),
         nullable=False,
     )
     to_membership: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
+        ForeignKey("memberships.id", ondelete="RESTRICT"),
         nullable=False,
     )
     amount_cents: Mapped[int] = mapped_column(BigInteger(), nullable=False)
     status: Mapped[SettlementStatus] = mapped_column(
-        SQLEnum(SettlementStatus, name="settlement_status"),
+        SQLEnum(SettlementStatus, name="settlement_status", values_callable=lambda e: [m.value for m in e]),
         server_default="'suggested'",
         nullable=False,
     )
@@ -1,26 +1,139 @@
 """Pytest configuration and fixtures for model tests.
 
 These tests require a running Postgres database (via docker-compose).
-The database should have migrations applied (alembic upgrade head).
+Each pytest-xdist worker creates its own database next to the configured one
+(``clearsplit_test_gw0``, ``clearsplit_test_gw1``, ...) and runs the Alembic
+migrations against it, so tests run against the same schema as production,
+triggers and deferred constraints included, and workers never see each
+other's rows. The database user needs the CREATEDB privilege.
+
+All async tests and fixtures share one session-scoped event loop so pooled
+asyncpg connections are never handed to a loop they were not created on.
+Each test runs inside an outer transaction that is rolled back afterwards;
+``session.commit()`` inside a test only releases a SAVEPOINT. Deferred
+constraints are forced to run before that rollback, so they still fail the
+test.
 """
 
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 
+from app.core.config import get_settings
 from app.db.session import SessionLocal
+from app.main import app
+from app.models import Group, Membership, MembershipRole, User
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - uvloop is unavailable on Windows
+    uvloop = None
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def _test_database_url() -> URL:
+    """Return the URL of this worker's test database."""
+    url = make_url(get_settings().database_url)
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    return url.set(database=f"{url.database}_test_{worker}")
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+    """Run every async test on the session-scoped event loop."""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
 
+@pytest.fixture(scope="session")
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Run async tests on uvloop when it is installed."""
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.DefaultEventLoopPolicy()
 
-@pytest.fixture(scope="function")
-async def session() -> AsyncSession:
+
+@pytest_asyncio.fixture(scope="session")
+async def engine() -> AsyncEngine:
+    """Create and migrate this worker's database, then yield an engine on it."""
+    url = _test_database_url()
+    admin_engine = create_async_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    async with admin_engine.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)'))
+        await conn.execute(text(f'CREATE DATABASE "{url.database}"'))
+
+    # alembic/env.py takes its URL from settings, so migrate in a child process.
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": url.render_as_string(hide_password=False)},
+        check=True,
+    )
+
+    engine = create_async_engine(
+        url,
+        connect_args={
+            # JIT is decided per query, only above jit_above_cost; the small
+            # test queries never benefit from it, so keep it off.
+            "server_settings": {"jit": "off"},
+            "prepared_statement_cache_size": 256,
+        },
+    )
+    yield engine
+    await engine.dispose()
+
+    async with admin_engine.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)'))
+    await admin_engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def session(engine: AsyncEngine) -> AsyncSession:
     """Create a test database session.
 
-    Note: This uses the existing database connection from app.db.session.
-    Ensure migrations are applied before running tests.
+    The session joins an outer transaction on a dedicated connection and
+    turns its own commits into SAVEPOINTs. Deferred constraints are checked
+    once the test finishes, and the outer transaction is always rolled back,
+    so nothing a test writes is ever persisted.
     """
-    async with SessionLocal() as session:
-        # Start a transaction
-        async with session.begin():
-            yield session
-            # Rollback after test
-            await session.rollback()
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            async with SessionLocal(
+                bind=connection, join_transaction_mode="create_savepoint"
+            ) as session:
+                yield session
+                # The outer transaction never commits, so run the deferred
+                # foreign keys and constraint triggers before rolling back.
+                await connection.execute(text("SET CONSTRAINTS ALL IMMEDIATE"))
+        finally:
+            await transaction.rollback()
+
+
+@pytest_asyncio.fixture(scope="function")
+async def group_with_owner(session: AsyncSession) -> tuple[User, Group, Membership]:
+    """Create a user, a group and the user's owner membership in one flush."""
+    user = User(email="owner@example.com", password_hash="hash")
+    group = Group(name="Test Group", currency="USD")
+    membership = Membership(group=group, user=user, role=MembershipRole.OWNER)
+    session.add(membership)
+    await session.flush()
+    return user, group, membership
+
 
+@pytest_asyncio.fixture(scope="session")
+async def client() -> AsyncClient:
+    """One in-process HTTP client, shared by every API test in the session."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
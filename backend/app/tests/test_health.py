@@ -1,10 +1,9 @@
-from fastapi.testclient import TestClient
+import pytest
+from httpx import AsyncClient
 
-from app.main import app
 
-
-def test_health():
-    client = TestClient(app)
-    resp = client.get("/health")
+@pytest.mark.asyncio
+async def test_health(client: AsyncClient):
+    resp = await client.get("/health")
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
@@ -1,15 +1,17 @@
 """Integration tests for SQLAlchemy models.
 
 These tests require a running Postgres database (via docker-compose).
-Mark with pytest.mark.integration if you want to skip them in unit test runs.
+They are marked ``integration`` and skipped by default; run them with
+``pytest -m integration``.
 """
 
 import uuid
 from datetime import date, datetime
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.models import (
     ActivityLog,
@@ -25,6 +27,23 @@ from app.models import (
     User,
 )
 
+pytestmark = pytest.mark.integration
+
+# Tests never span midnight, so one date serves the whole module.
+_TODAY = date.today()
+
+
+async def _mk_user_ids(session: AsyncSession, n: int) -> list[uuid.UUID]:
+    """Insert ``n`` users with a single executemany INSERT ... RETURNING id.
+
+    Only the ids come back, so no User objects are hydrated into the session.
+    """
+    result = await session.scalars(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [{"email": f"user{i}@example.com", "password_hash": "hash"} for i in range(1, n + 1)],
+    )
+    return list(result.all())
+
 
 @pytest.mark.asyncio
 async def test_user_model(session: AsyncSession):
@@ -35,7 +54,6 @@ async def test_user_model(session: AsyncSession):
     )
     session.add(user)
     await session.commit()
-    await session.refresh(user)
 
     assert user.id is not None
     assert isinstance(user.id, uuid.UUID)
@@ -54,7 +72,6 @@ async def test_group_model(session: AsyncSession):
     )
     session.add(group)
     await session.commit()
-    await session.refresh(group)
 
     assert group.id is not None
     assert isinstance(group.id, uuid.UUID)
@@ -69,17 +86,13 @@ async def test_membership_model(session: AsyncSession):
     """Test Membership model with relationships."""
     user = User(email="member@example.com", password_hash="hash")
     group = Group(name="Test Group", currency="USD")
-    session.add_all([user, group])
-    await session.flush()
-
     membership = Membership(
-        group_id=group.id,
-        user_id=user.id,
+        group=group,
+        user=user,
         role=MembershipRole.MEMBER,
     )
     session.add(membership)
     await session.commit()
-    await session.refresh(membership)
 
     assert membership.id is not None
     assert membership.role == MembershipRole.MEMBER
@@ -88,33 +101,23 @@ async def test_membership_model(session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_expense_model(session: AsyncSession):
+async def test_expense_model(
+    session: AsyncSession, group_with_owner: tuple[User, Group, Membership]
+):
     """Test Expense model creation."""
-    user = User(email="payer@example.com", password_hash="hash")
-    group = Group(name="Test Group", currency="USD")
-    session.add_all([user, group])
-    await session.flush()
-
-    membership = Membership(
-        group_id=group.id,
-        user_id=user.id,
-        role=MembershipRole.OWNER,
-    )
-    session.add(membership)
-    await session.flush()
+    _, group, membership = group_with_owner
 
     expense = Expense(
-        group_id=group.id,
+        group=group,
         title="Test Expense",
         amount_cents=10000,  # $100.00
         currency="USD",
         paid_by=membership.id,
-        expense_date=date.today(),
+        expense_date=_TODAY,
         memo="Test memo",
     )
     session.add(expense)
     await session.commit()
-    await session.refresh(expense)
 
     assert expense.id is not None
     assert expense.amount_cents == 10000
@@ -125,44 +128,38 @@ async def test_expense_model(session: AsyncSession):
 @pytest.mark.asyncio
 async def test_expense_split_model(session: AsyncSession):
     """Test ExpenseSplit model with relationships."""
-    user1 = User(email="user1@example.com", password_hash="hash")
-    user2 = User(email="user2@example.com", password_hash="hash")
+    user1_id, user2_id = await _mk_user_ids(session, 2)
     group = Group(name="Test Group", currency="USD")
-    session.add_all([user1, user2, group])
-    await session.flush()
-
     membership1 = Membership(
-        group_id=group.id,
-        user_id=user1.id,
+        group=group,
+        user_id=user1_id,
         role=MembershipRole.MEMBER,
     )
     membership2 = Membership(
-        group_id=group.id,
-        user_id=user2.id,
+        group=group,
+        user_id=user2_id,
         role=MembershipRole.MEMBER,
     )
     session.add_all([membership1, membership2])
     await session.flush()
 
     expense = Expense(
-        group_id=group.id,
+        group=group,
         title="Split Expense",
         amount_cents=20000,  # $200.00
         currency="USD",
         paid_by=membership1.id,
-        expense_date=date.today(),
+        expense_date=_TODAY,
     )
-    session.add(expense)
-    await session.flush()
 
     split1 = ExpenseSplit(
-        expense_id=expense.id,
+        expense=expense,
         group_id=group.id,
         membership_id=membership1.id,
         share_cents=10000,  # $100.00
     )
     split2 = ExpenseSplit(
-        expense_id=expense.id,
+        expense=expense,
         group_id=group.id,
         membership_id=membership2.id,
         share_cents=10000,  # $100.00
@@ -177,19 +174,14 @@ async def test_expense_split_model(session: AsyncSession):
 @pytest.mark.asyncio
 async def test_settlement_batch_model(session: AsyncSession):
     """Test SettlementBatch model."""
-    user = User(email="user@example.com", password_hash="hash")
     group = Group(name="Test Group", currency="USD")
-    session.add_all([user, group])
-    await session.flush()
-
     batch = SettlementBatch(
-        group_id=group.id,
+        group=group,
         status=SettlementStatus.SUGGESTED,
         total_settlements=2,
     )
     session.add(batch)
     await session.commit()
-    await session.refresh(batch)
 
     assert batch.id is not None
     assert batch.status == SettlementStatus.SUGGESTED
@@ -200,35 +192,28 @@ async def test_settlement_batch_model(session: AsyncSession):
 @pytest.mark.asyncio
 async def test_settlement_model(session: AsyncSession):
     """Test Settlement model."""
-    user1 = User(email="user1@example.com", password_hash="hash")
-    user2 = User(email="user2@example.com", password_hash="hash")
+    user1_id, user2_id = await _mk_user_ids(session, 2)
     group = Group(name="Test Group", currency="USD")
-    session.add_all([user1, user2, group])
-    await session.flush()
-
     membership1 = Membership(
-        group_id=group.id,
-        user_id=user1.id,
+        group=group,
+        user_id=user1_id,
         role=MembershipRole.MEMBER,
     )
     membership2 = Membership(
-        group_id=group.id,
-        user_id=user2.id,
+        group=group,
+        user_id=user2_id,
         role=MembershipRole.MEMBER,
     )
     session.add_all([membership1, membership2])
     await session.flush()
 
     batch = SettlementBatch(
-        group_id=group.id,
+        group=group,
         status=SettlementStatus.SUGGESTED,
         total_settlements=1,
     )
-    session.add(batch)
-    await session.flush()
-
     settlement = Settlement(
-        batch_id=batch.id,
+        batch=batch,
         group_id=group.id,
         from_membership=membership1.id,
         to_membership=membership2.id,
@@ -237,7 +222,6 @@ async def test_settlement_model(session: AsyncSession):
     )
     session.add(settlement)
     await session.commit()
-    await session.refresh(settlement)
 
     assert settlement.id is not None
     assert settlement.amount_cents == 5000
@@ -246,31 +230,21 @@ async def test_settlement_model(session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_activity_log_model(session: AsyncSession):
+async def test_activity_log_model(
+    session: AsyncSession, group_with_owner: tuple[User, Group, Membership]
+):
     """Test ActivityLog model."""
-    user = User(email="user@example.com", password_hash="hash")
-    group = Group(name="Test Group", currency="USD")
-    session.add_all([user, group])
-    await session.flush()
-
-    membership = Membership(
-        group_id=group.id,
-        user_id=user.id,
-        role=MembershipRole.OWNER,
-    )
-    session.add(membership)
-    await session.flush()
+    _, group, membership = group_with_owner
 
     log = ActivityLog(
-        group_id=group.id,
-        actor_membership=membership.id,
+        group=group,
+        actor=membership,
         event_type="expense.created",
         subject_id=uuid.uuid4(),
         activity_metadata={"key": "value"},
     )
     session.add(log)
     await session.commit()
-    await session.refresh(log)
 
     assert log.id is not None
     assert log.event_type == "expense.created"
@@ -281,19 +255,15 @@ async def test_activity_log_model(session: AsyncSession):
 async def test_idempotency_key_model(session: AsyncSession):
     """Test IdempotencyKey model."""
     user = User(email="user@example.com", password_hash="hash")
-    session.add(user)
-    await session.flush()
-
     idempotency_key = IdempotencyKey(
         endpoint="/api/expenses",
-        user_id=user.id,
+        user=user,
         request_hash="abc123",
         response_body={"id": "test-id"},
         status_code=201,
     )
     session.add(idempotency_key)
     await session.commit()
-    await session.refresh(idempotency_key)
 
     assert idempotency_key.id is not None
     assert idempotency_key.endpoint == "/api/expenses"
@@ -302,34 +272,31 @@ async def test_idempotency_key_model(session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_group_relationships(session: AsyncSession):
+async def test_group_relationships(
+    session: AsyncSession, group_with_owner: tuple[User, Group, Membership]
+):
     """Test Group model relationships."""
-    user = User(email="user@example.com", password_hash="hash")
-    group = Group(name="Test Group", currency="USD")
-    session.add_all([user, group])
-    await session.flush()
-
-    membership = Membership(
-        group_id=group.id,
-        user_id=user.id,
-        role=MembershipRole.OWNER,
-    )
-    session.add(membership)
-    await session.flush()
+    _, group, membership = group_with_owner
 
     expense = Expense(
-        group_id=group.id,
+        group=group,
         title="Test Expense",
         amount_cents=10000,
         currency="USD",
         paid_by=membership.id,
-        expense_date=date.today(),
+        expense_date=_TODAY,
     )
     session.add(expense)
     await session.commit()
 
-    # Test relationships
-    await session.refresh(group)
+    # Test relationships, loaded back from the database in one query per collection
+    result = await session.execute(
+        select(Group)
+        .where(Group.id == group.id)
+        .options(selectinload(Group.memberships), selectinload(Group.expenses))
+        .execution_options(populate_existing=True)
+    )
+    group = result.scalar_one()
     assert len(group.memberships) == 1
     assert len(group.expenses) == 1
     assert group.memberships[0].id == membership.id
@@ -337,34 +304,22 @@ async def test_group_relationships(session: AsyncSession):
 
 
 @pytest.mark.asyncio
-async def test_expense_relationships(session: AsyncSession):
+async def test_expense_relationships(
+    session: AsyncSession, group_with_owner: tuple[User, Group, Membership]
+):
     """Test Expense model relationships."""
-    user = User(email="user@example.com", password_hash="hash")
-    group = Group(name="Test Group", currency="USD")
-    session.add_all([user, group])
-    await session.flush()
-
-    membership = Membership(
-        group_id=group.id,
-        user_id=user.id,
-        role=MembershipRole.MEMBER,
-    )
-    session.add(membership)
-    await session.flush()
+    _, group, membership = group_with_owner
 
     expense = Expense(
-        group_id=group.id,
+        group=group,
         title="Test Expense",
         amount_cents=20000,
         currency="USD",
         paid_by=membership.id,
-        expense_date=date.today(),
+        expense_date=_TODAY,
     )
-    session.add(expense)
-    await session.flush()
-
     split1 = ExpenseSplit(
-        expense_id=expense.id,
+        expense=expense,
         group_id=group.id,
         membership_id=membership.id,
         share_cents=20000,
@@ -372,7 +327,13 @@ async def test_expense_relationships(session: AsyncSession):
     session.add(split1)
     await session.commit()
 
-    await session.refresh(expense)
+    result = await session.execute(
+        select(Expense)
+        .where(Expense.id == expense.id)
+        .options(selectinload(Expense.splits))
+        .execution_options(populate_existing=True)
+    )
+    expense = result.scalar_one()
     assert len(expense.splits) == 1
     assert expense.splits[0].share_cents == 20000
 